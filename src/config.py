@@ -1,5 +1,6 @@
 from dotenv import load_dotenv
 import os
+import importlib.util
 from typing import Dict
 import logging
 
@@ -15,15 +16,26 @@ MODEL_NAME = "gpt-4-2024-11-20"
 MODEL_TEMPERATURE = 0
 API_TIMEOUT = 30  # seconds
 MAX_RETRIES = 3
+MAX_CONCURRENT_REQUESTS = 10  # in-flight requests for batch generation
+BATCH_COMPLETION_WINDOW = "24h"  # Batch API turnaround for offline runs
+BATCH_POLL_INTERVAL = 60  # seconds between Batch API status checks
+BATCH_FILE_TIMEOUT = 300  # seconds for Batch API file uploads/downloads
+HTTP_MAX_CONNECTIONS = 64
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+RESPONSE_CACHE_SIZE = 4096  # recommendations kept for repeated clinical scenarios
 
 # Data configuration
 INPUT_DATA_PATH = "data/Data-Extraction-Table.csv"
 OUTPUT_DATA_PATH = "data/output.csv"
 PROTOCOL_REFERENCE_PATH = "data/Institutional-Protocols.xlsx"
+# Prefer the Rust-based calamine XLSX parser, falling back to pandas' default
+EXCEL_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else "openpyxl"
 EGFR_CONTRAINDICATED = 30
+CSV_CHUNK_SIZE = 256  # rows per chunk when streaming input data
 
 # Data processing configuration
-NO_DATA_VARIANTS = ["no data", "No data", "NO DATA", "No Data", ""]
+NO_DATA_VARIANTS = ["no data", "No data", "NO DATA", "No Data", "nodata", "no_data", ""]
+NO_DATA_VARIANTS_LOWER = frozenset(variant.lower() for variant in NO_DATA_VARIANTS)  # compare against value.strip().lower()
 
 # Column names configuration
 COLUMN_NAMES = {
@@ -38,6 +50,19 @@ COLUMN_NAMES = {
     'CREATININE': 'Creatinine (umol/L)'
 }
 
+# patient_info keys for each input column in COLUMN_NAMES
+PATIENT_INFO_FIELDS = {
+    'STUDY_ID': 'Study_ID',
+    'LOCATION': 'Location',
+    'AGE': 'Age',
+    'SEX': 'Sex',
+    'CT_EXAM': 'CT_Exam',
+    'CLINICAL_INFO': 'Clinical_Info',
+    'PRIOR_REACTION': 'Prior_Reaction',
+    'EGFR': 'eGFR',
+    'CREATININE': 'Creatinine'
+}
+
 # Protocol reference column mapping
 PROTOCOL_COLUMN_MAPPING = {
     'Protocol': 'Protocol',
@@ -48,6 +73,15 @@ PROTOCOL_COLUMN_MAPPING = {
     'Notes': 'Notes'
 }
 
+# Standard protocol field mapping (renamed reference column -> get_standard_protocols key)
+STANDARD_PROTOCOL_FIELDS = {
+    'IV_Contrast': 'iv_contrast',
+    'Oral_Contrast': 'oral_contrast',
+    'Acquisitions': 'acquisitions',
+    'Example_Indications': 'example_indications',
+    'Notes': 'notes'
+}
+
 # Logging configuration
 LOG_LEVEL = logging.INFO
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -167,12 +201,26 @@ Priority 4:
    -Chronic/non-urgent (e.g., abdominal xmonths or years)
 """
 
+# Response format instructions
+RESPONSE_FORMAT_GUIDANCE = """Provide your recommendation in this exact JSON format:
+{
+    "priority": 1 or 2 or 3 or 4,
+    "protocol": "A/P or C/A/P or specific protocol",
+    "iv_contrast": "C+ or C- or C+ and C-",
+    "oral_contrast": "None or Water base or Water Only or Readi-Cat or Other"
+}"""
+
 # Valid options with more specific descriptions
-VALID_PRIORITIES = [1, 2, 3, 4]  # 1=STAT, 2=48h, 3=10d, 4=>10d
-VALID_IV_CONTRAST = ["C+", "C-", "C+ and C-"]  # C+ = with contrast, C- = without contrast
-VALID_ORAL_CONTRAST = ["Water base", "Water Only", "Readi-Cat", "None", "Other", "Other (rectal)", "Other (3% sorbitol)"]
+VALID_PRIORITIES = frozenset({1, 2, 3, 4})  # 1=STAT, 2=48h, 3=10d, 4=>10d
+VALID_IV_CONTRAST = frozenset({"C+", "C-", "C+ and C-"})  # C+ = with contrast, C- = without contrast
+VALID_ORAL_CONTRAST = frozenset({"Water base", "Water Only", "Readi-Cat", "None", "Other", "Other (rectal)", "Other (3% sorbitol)"})
 
 # Setup logging
+# LOG_FORMAT does not use thread or process fields, so skip collecting them per record
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
 logging.basicConfig(
     level=LOG_LEVEL,
     format=LOG_FORMAT,
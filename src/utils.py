@@ -1,11 +1,27 @@
 import openai
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+import httpx
 import pandas as pd
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    wait_random_exponential,
+    stop_after_attempt,
+    before_sleep_log
+)
 import os
-from typing import Dict, Union, List, Optional
+import time
+import asyncio
+import json
+import hashlib
+import functools
+import numbers
+from typing import Dict, Union, List, Optional, Iterator, Tuple, Mapping
 import logging
 from config import (
+    OPENAI_API_KEY,
     PROTOCOL_REFERENCE_PATH,
+    EXCEL_ENGINE,
     VALID_PRIORITIES,
     VALID_IV_CONTRAST,
     VALID_ORAL_CONTRAST,
@@ -14,22 +30,95 @@ from config import (
     MODEL_TEMPERATURE,
     SYSTEM_PROMPT,
     PROTOCOL_SELECTION_GUIDANCE,
+    RESPONSE_FORMAT_GUIDANCE,
     PROTOCOL_COLUMN_MAPPING,
-    NO_DATA_VARIANTS,
+    STANDARD_PROTOCOL_FIELDS,
+    COLUMN_NAMES,
+    PATIENT_INFO_FIELDS,
+    NO_DATA_VARIANTS_LOWER,
     API_TIMEOUT,
     MAX_RETRIES,
+    MAX_CONCURRENT_REQUESTS,
+    BATCH_COMPLETION_WINDOW,
+    BATCH_POLL_INTERVAL,
+    BATCH_FILE_TIMEOUT,
+    CSV_CHUNK_SIZE,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    RESPONSE_CACHE_SIZE,
     logger
 )
 
-# Initialize OpenAI client with API key from environment
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Initialize OpenAI client with the API key resolved once in config.
+# The HTTP client keeps HTTP/2 connections alive across requests, so each
+# patient does not pay for a new TCP/TLS handshake. The async client is
+# created per batch instead (see _create_async_client), since its pooled
+# connections are bound to the event loop that opened them.
+_http_limits = httpx.Limits(
+    max_connections=HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS
+)
+client = OpenAI(
+    api_key=OPENAI_API_KEY,
+    max_retries=0,  # retries are handled by _retry_transient_errors
+    http_client=httpx.Client(http2=True, limits=_http_limits, timeout=API_TIMEOUT)
+)
+
+# Retry only transient API failures, with jittered exponential backoff
+_retry_transient_errors = retry(
+    retry=retry_if_exception_type((
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError
+    )),
+    wait=wait_random_exponential(min=1, max=20),
+    stop=stop_after_attempt(MAX_RETRIES),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True
+)
+
+# Per-patient user message. The static protocol context is sent as its own
+# message rather than templated in, since it may itself contain braces.
+_PATIENT_PROMPT_TEMPLATE = """Patient Information:
+Study ID: {Study_ID}
+Location: {Location}
+CT Exam Requested: {CT_Exam}
+Clinical Info: {Clinical_Info}
+Prior Contrast Reaction: {Prior_Reaction}
+eGFR: {eGFR} mL/min"""
+
+# Patient fields needed to build the prompt
+ESSENTIAL_PATIENT_FIELDS = frozenset({'Study_ID', 'Location', 'CT_Exam', 'Clinical_Info', 'eGFR'})
 
-def load_data(file_path: str) -> pd.DataFrame:
+# Keys every model recommendation must contain
+RECOMMENDATION_KEYS = frozenset({'priority', 'protocol', 'iv_contrast', 'oral_contrast'})
+
+# Column names of the protocol reference after renaming
+_PROTOCOL_COLUMNS = frozenset(PROTOCOL_COLUMN_MAPPING.values())
+
+# Batch API job statuses after which no further progress is made
+_BATCH_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+# Validated recommendations for previously seen prompts, keyed by _response_cache_key
+_response_cache: Dict[str, Dict] = {}
+
+# eGFR buckets that drive the IV contrast decision
+_EGFR_UNKNOWN = "unknown"
+_EGFR_LOW = f"<{EGFR_CONTRAINDICATED}"
+_EGFR_NORMAL = f">={EGFR_CONTRAINDICATED}"
+
+def load_data(file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
     """
     Load data from CSV file.
     
+    The file is parsed with the multithreaded pyarrow reader into
+    Arrow-backed columns, and only the requested columns are read.
+    
     Args:
         file_path (str): Path to the CSV file
+        columns (Optional[List[str]]): Columns to load. Defaults to the
+            input columns listed in COLUMN_NAMES.
         
     Returns:
         pd.DataFrame: Loaded data
@@ -39,18 +128,163 @@ def load_data(file_path: str) -> pd.DataFrame:
         ValueError: If the file is not a valid CSV
     """
     try:
-        return pd.read_csv(file_path)
+        return pd.read_csv(
+            file_path,
+            engine="pyarrow",
+            usecols=columns or list(COLUMN_NAMES.values()),
+            # Keep study IDs as written, e.g. leading zeros in "00123"
+            dtype={COLUMN_NAMES['STUDY_ID']: str},
+            dtype_backend="pyarrow"
+        )
+    except FileNotFoundError:
+        logger.error("File not found: %s", file_path)
+        raise
+    except Exception as e:
+        logger.error("Error loading CSV file %s: %s", file_path, e)
+        raise ValueError(f"Invalid CSV file: {file_path}")
+
+def load_data_chunks(
+    file_path: str, chunksize: int = CSV_CHUNK_SIZE, columns: Optional[List[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Load data from CSV file in chunks of at most `chunksize` rows.
+    
+    Unlike load_data, the whole file is never held in memory, so large
+    extracts can be processed one chunk at a time. Chunks keep the raw CSV
+    headers from COLUMN_NAMES; use iter_patients to get patient_info dicts
+    for generate_protocol_recommendations(_batch).
+    
+    Args:
+        file_path (str): Path to the CSV file
+        chunksize (int): Number of rows per chunk
+        columns (Optional[List[str]]): Columns to load. Defaults to the
+            input columns listed in COLUMN_NAMES.
+        
+    Returns:
+        Iterator[pd.DataFrame]: Chunks of the loaded data
+        
+    Raises:
+        FileNotFoundError: If the file does not exist
+        ValueError: If the file is not a valid CSV
+    """
+    # The pyarrow engine does not support chunked reading, so use the C parser,
+    # but keep the same Arrow-backed dtypes as load_data
+    try:
+        return pd.read_csv(
+            file_path,
+            chunksize=chunksize,
+            usecols=columns or list(COLUMN_NAMES.values()),
+            # Keep study IDs as written, e.g. leading zeros in "00123"
+            dtype={COLUMN_NAMES['STUDY_ID']: str},
+            dtype_backend="pyarrow"
+        )
     except FileNotFoundError:
-        logger.error(f"File not found: {file_path}")
+        logger.error("File not found: %s", file_path)
         raise
     except Exception as e:
-        logger.error(f"Error loading CSV file {file_path}: {str(e)}")
+        logger.error("Error loading CSV file %s: %s", file_path, e)
         raise ValueError(f"Invalid CSV file: {file_path}")
 
+def iter_patients(file_path: str, chunksize: int = CSV_CHUNK_SIZE) -> Iterator[Dict]:
+    """
+    Yield rows of a patient CSV one at a time as patient_info dicts.
+    
+    Rows are read `chunksize` at a time via load_data_chunks, so memory use
+    does not grow with the size of the file. Each row is converted with
+    to_patient_info; rows whose eGFR cannot be parsed are logged and skipped
+    rather than treated as normal renal function.
+    
+    Args:
+        file_path (str): Path to the CSV file
+        chunksize (int): Number of rows read per chunk
+        
+    Returns:
+        Iterator[dict]: One patient_info dictionary per valid patient row
+    """
+    for chunk in load_data_chunks(file_path, chunksize):
+        for record in chunk.to_dict('records'):
+            try:
+                yield to_patient_info(record)
+            except ValueError as e:
+                logger.error("Skipping study %s: %s", record.get(COLUMN_NAMES['STUDY_ID']), e)
+
+@functools.lru_cache(maxsize=4)
+def _load_protocol_reference_cached(protocol_file: str, mtime: float) -> pd.DataFrame:
+    """
+    Parse the protocol reference Excel file, memoized on (path, mtime).
+    
+    The modification time is part of the cache key so that edits to the
+    protocol reference are picked up without restarting the process.
+    """
+    # Read the Excel file
+    df = pd.read_excel(protocol_file, engine=EXCEL_ENGINE)
+    
+    # Rename columns according to mapping, unless the file already uses the target names
+    if _PROTOCOL_COLUMNS <= set(df.columns):
+        return df
+    return df.rename(columns=PROTOCOL_COLUMN_MAPPING)
+
+@functools.lru_cache(maxsize=4)
+def _build_standard_protocols(protocol_file: str, mtime: float) -> Dict:
+    """
+    Convert the protocol reference to the standard dict format, memoized on (path, mtime).
+    """
+    df = _load_protocol_reference_cached(protocol_file, mtime)
+    details = df[list(STANDARD_PROTOCOL_FIELDS)].rename(columns=STANDARD_PROTOCOL_FIELDS)
+    return dict(zip(df['Protocol'].tolist(), details.to_dict('records')))
+
+@functools.lru_cache(maxsize=4)
+def _render_protocol_guidance(protocol_file: str, mtime: float) -> str:
+    """
+    Render the protocol reference as prompt text, memoized on (path, mtime).
+    """
+    reference_protocols = _load_protocol_reference_cached(protocol_file, mtime)
+    
+    # Make protocol guidance more structured
+    relevant_protocols = reference_protocols[
+        ['Protocol', 'IV_Contrast', 'Oral_Contrast', 'Example_Indications']
+    ].itertuples(index=False, name=None)
+    
+    parts = ["CT Protocol Reference Document Specifications:"]
+    parts.extend(
+        f"Protocol: {protocol}\n"
+        f"- IV Contrast: {iv_contrast}\n"
+        f"- Oral Contrast: {oral_contrast}\n"
+        f"- Example Indications: {example_indications}"
+        for protocol, iv_contrast, oral_contrast, example_indications in relevant_protocols
+    )
+    
+    return "\n".join(parts)
+
+@functools.lru_cache(maxsize=4)
+def _render_static_prompt(protocol_file: str, mtime: float) -> str:
+    """
+    Render the patient-independent user message, memoized on (path, mtime).
+    
+    It is sent before the patient message so that every request shares the
+    same byte-identical prefix, which OpenAI's prompt caching can reuse.
+    """
+    protocol_guidance = _render_protocol_guidance(protocol_file, mtime)
+    return f"{PROTOCOL_SELECTION_GUIDANCE}\n\n{protocol_guidance}\n\n{RESPONSE_FORMAT_GUIDANCE}"
+
+@functools.lru_cache(maxsize=4)
+def _hash_static_prompt(protocol_file: str, mtime: float) -> bytes:
+    """
+    Digest of the static user message, memoized on (path, mtime).
+    
+    Response cache keys combine this with the per-patient fields, so the
+    multi-KB static text is hashed once rather than for every patient.
+    """
+    static_prompt = _render_static_prompt(protocol_file, mtime)
+    return hashlib.blake2b(static_prompt.encode(), digest_size=16).digest()
+
 def load_protocol_reference(protocol_file: str) -> pd.DataFrame:
     """
     Load and process the protocol reference data.
     
+    The parsed DataFrame is cached per file modification time, so repeated
+    calls do not re-read the Excel file. Callers must not modify it in place.
+    
     Args:
         protocol_file (str): Path to the institutional protocols Excel file
         
@@ -62,19 +296,243 @@ def load_protocol_reference(protocol_file: str) -> pd.DataFrame:
         ValueError: If the file is not a valid Excel file
     """
     try:
-        # Read the Excel file
-        df = pd.read_excel(protocol_file)
+        return _load_protocol_reference_cached(protocol_file, os.path.getmtime(protocol_file))
+    except FileNotFoundError:
+        logger.error("Protocol reference file not found: %s", protocol_file)
+        raise
+    except Exception as e:
+        logger.error("Error loading protocol reference file %s: %s", protocol_file, e)
+        raise ValueError(f"Invalid protocol reference file: {protocol_file}")
+
+def is_missing(value) -> bool:
+    """
+    Return True if a scalar cell value is missing (None, NaN or pd.NA).
+    
+    A cheaper per-row alternative to pd.isna, which dispatches through
+    array handling even for a single scalar.
+    """
+    return value is None or value is pd.NA or (isinstance(value, float) and value != value)
+
+def parse_egfr(value) -> Union[float, str]:
+    """
+    Normalize a raw eGFR cell value.
+    
+    Args:
+        value: eGFR as read from the CSV (number, string or missing)
         
-        # Rename columns according to mapping
-        df = df.rename(columns=PROTOCOL_COLUMN_MAPPING)
+    Returns:
+        Union[float, str]: "no data" for missing or no-data values, 90 for
+            ">90", otherwise the value as a float
         
-        return df
+    Raises:
+        ValueError: If the value is not a number or a recognized no-data value
+    """
+    if is_missing(value):
+        return "no data"
+    if isinstance(value, str):
+        value = value.strip()
+        if value.lower() in NO_DATA_VARIANTS_LOWER:
+            return "no data"
+        if value == ">90":
+            return 90
+    # Don't cap values greater than 90
+    egfr = float(value)
+    # NaN that is_missing does not recognize, e.g. np.float32('nan')
+    return "no data" if egfr != egfr else egfr
+
+def to_patient_info(row: Mapping) -> Dict:
+    """
+    Convert a raw CSV row into the patient_info format used for prompting.
+    
+    Args:
+        row (Mapping): Row keyed by the CSV headers in COLUMN_NAMES, e.g. a
+            pandas Series or a record from load_data_chunks
+        
+    Returns:
+        dict: Patient information keyed by PATIENT_INFO_FIELDS, with a
+            normalized eGFR
+        
+    Raises:
+        ValueError: If the eGFR value cannot be parsed
+    """
+    patient_info = {
+        PATIENT_INFO_FIELDS[key]: row.get(column)
+        for key, column in COLUMN_NAMES.items()
+    }
+    patient_info['eGFR'] = parse_egfr(patient_info['eGFR'])
+    return patient_info
+
+def _no_data_recommendations() -> Dict:
+    """Return the placeholder recommendation used when none can be generated."""
+    return {
+        "priority": "no data",
+        "protocol": "no data",
+        "iv_contrast": "no data",
+        "oral_contrast": "no data"
+    }
+
+def _validate_patient_info(patient_info: dict) -> None:
+    """
+    Check that the fields needed to build the prompt are present.
+    
+    Raises:
+        ValueError: If a required field is missing
+    """
+    # Simplified input validation - only check essential fields
+    missing = ESSENTIAL_PATIENT_FIELDS - patient_info.keys()
+    if missing:
+        logger.error("Missing required field(s): %s", sorted(missing))
+        raise ValueError(f"Missing required field(s): {sorted(missing)}")
+
+def _get_static_prompt() -> Tuple[str, bytes]:
+    """
+    Return the cached static user message and its digest for the configured reference file.
+    
+    Raises:
+        FileNotFoundError: If the protocol reference file does not exist
+        ValueError: If the protocol reference file is not a valid Excel file
+    """
+    try:
+        mtime = os.path.getmtime(PROTOCOL_REFERENCE_PATH)
+        return (
+            _render_static_prompt(PROTOCOL_REFERENCE_PATH, mtime),
+            _hash_static_prompt(PROTOCOL_REFERENCE_PATH, mtime)
+        )
     except FileNotFoundError:
-        logger.error(f"Protocol reference file not found: {protocol_file}")
+        logger.error("Protocol reference file not found: %s", PROTOCOL_REFERENCE_PATH)
         raise
     except Exception as e:
-        logger.error(f"Error loading protocol reference file {protocol_file}: {str(e)}")
-        raise ValueError(f"Invalid protocol reference file: {protocol_file}")
+        logger.error("Error loading protocol reference file %s: %s", PROTOCOL_REFERENCE_PATH, e)
+        raise ValueError(f"Invalid protocol reference file: {PROTOCOL_REFERENCE_PATH}")
+
+def _egfr_bucket(egfr_value: Union[float, str, int]) -> Optional[str]:
+    """
+    Collapse an eGFR value into the range that drives the contrast decision.
+    
+    The value is normalized with parse_egfr first, so numpy scalars and
+    numeric strings are classified like the equivalent float. Returns None
+    if the value cannot be parsed; such patients must not share a cached answer.
+    
+    Not memoized: equal-comparing keys such as np.int64(20) and 20 would
+    make the result depend on which was classified first, and the check
+    is already constant time.
+    """
+    try:
+        egfr = parse_egfr(egfr_value)
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(egfr, numbers.Real):
+        return _EGFR_UNKNOWN
+    if egfr < EGFR_CONTRAINDICATED:
+        return _EGFR_LOW
+    return _EGFR_NORMAL
+
+def _response_cache_key(patient_info: dict, static_digest: bytes) -> Optional[str]:
+    """
+    Hash the clinically relevant parts of a prompt into a cache key.
+    
+    The study ID is left out and eGFR is reduced to its bucket, so patients
+    with the same exam request and clinical picture share one model call.
+    Returns None, meaning "do not cache", if the eGFR cannot be bucketed.
+    """
+    egfr_bucket = _egfr_bucket(patient_info['eGFR'])
+    if egfr_bucket is None:
+        return None
+    canonical = "\x1f".join(str(value) for value in (
+        patient_info['Location'],
+        patient_info['CT_Exam'],
+        patient_info['Clinical_Info'],
+        patient_info.get('Prior_Reaction', 'None'),
+        egfr_bucket,
+    ))
+    key = hashlib.blake2b(canonical.encode(), digest_size=16)
+    key.update(static_digest)
+    return key.hexdigest()
+
+def _get_cached_recommendations(cache_key: Optional[str]) -> Optional[Dict]:
+    """Return a copy of the cached recommendation for `cache_key`, if any."""
+    if cache_key is None:
+        return None
+    cached = _response_cache.get(cache_key)
+    return dict(cached) if cached is not None else None
+
+def _cache_recommendations(cache_key: Optional[str], recommendations: Dict) -> None:
+    """Store a validated recommendation, evicting the oldest entry when full."""
+    if cache_key is None:
+        return
+    if len(_response_cache) >= RESPONSE_CACHE_SIZE:
+        _response_cache.pop(next(iter(_response_cache)))
+    _response_cache[cache_key] = dict(recommendations)
+
+def _build_messages(patient_info: dict, static_prompt: str) -> List[Dict]:
+    """
+    Build the chat messages for a single patient.
+    
+    Static content comes first and the patient details last, so the shared
+    prefix is as long as possible for prompt caching.
+    """
+    patient_block = _PATIENT_PROMPT_TEMPLATE.format_map({'Prior_Reaction': 'None', **patient_info})
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": static_prompt},
+        {"role": "user", "content": patient_block}
+    ]
+
+@_retry_transient_errors
+def _request_recommendations(messages: List[Dict]) -> str:
+    """Send one chat completion request and return the raw response text."""
+    response = client.chat.completions.create(
+        model=MODEL_NAME,
+        messages=messages,
+        temperature=MODEL_TEMPERATURE,
+        timeout=API_TIMEOUT,
+        response_format={"type": "json_object"}
+    )
+    return response.choices[0].message.content
+
+def _create_async_client() -> AsyncOpenAI:
+    """Create an async OpenAI client with its own HTTP/2 connection pool."""
+    return AsyncOpenAI(
+        api_key=OPENAI_API_KEY,
+        max_retries=0,
+        http_client=httpx.AsyncClient(http2=True, limits=_http_limits, timeout=API_TIMEOUT)
+    )
+
+@_retry_transient_errors
+async def _arequest_recommendations(aclient: AsyncOpenAI, messages: List[Dict]) -> str:
+    """Async counterpart of _request_recommendations."""
+    response = await aclient.chat.completions.create(
+        model=MODEL_NAME,
+        messages=messages,
+        temperature=MODEL_TEMPERATURE,
+        timeout=API_TIMEOUT,
+        response_format={"type": "json_object"}
+    )
+    return response.choices[0].message.content
+
+def _parse_recommendations(content: str) -> Dict:
+    """
+    Parse and validate the model's JSON response.
+    
+    Raises:
+        ValueError: If the response is not a valid recommendation
+    """
+    recommendations = json.loads(content)
+    
+    # Validate recommendations
+    if not isinstance(recommendations, dict) or not RECOMMENDATION_KEYS <= recommendations.keys():
+        raise ValueError("Invalid recommendation format")
+        
+    if recommendations['priority'] not in VALID_PRIORITIES:
+        raise ValueError(f"Invalid priority: {recommendations['priority']}")
+        
+    if recommendations['iv_contrast'] not in VALID_IV_CONTRAST:
+        raise ValueError(f"Invalid IV contrast: {recommendations['iv_contrast']}")
+        
+    if recommendations['oral_contrast'] not in VALID_ORAL_CONTRAST:
+        raise ValueError(f"Invalid oral contrast: {recommendations['oral_contrast']}")
+    
+    return recommendations
 
 def generate_protocol_recommendations(patient_info: dict, egfr: Union[float, str, int]) -> Dict:
     """
@@ -88,114 +546,275 @@ def generate_protocol_recommendations(patient_info: dict, egfr: Union[float, str
         dict: Dictionary containing protocol recommendations
         
     Raises:
-        ValueError: If required fields are missing
+        ValueError: If required fields are missing or the protocol reference
+            file is not a valid Excel file
+        FileNotFoundError: If the protocol reference file does not exist
         Exception: If there's an error generating recommendations
     """
-    # Simplified input validation - only check essential fields
-    essential_fields = ['Study_ID', 'Location', 'CT_Exam', 'Clinical_Info', 'eGFR']
-    for field in essential_fields:
-        if field not in patient_info:
-            logger.error(f"Missing required field: {field}")
-            raise ValueError(f"Missing required field: {field}")
+    _validate_patient_info(patient_info)
 
-    # Get reference protocols with error handling
+    static_prompt, static_digest = _get_static_prompt()
+
+    cache_key = _response_cache_key(patient_info, static_digest)
+    cached = _get_cached_recommendations(cache_key)
+    if cached is not None:
+        return cached
+
+    messages = _build_messages(patient_info, static_prompt)
+
+    # Transient API errors are retried inside _request_recommendations
     try:
-        reference_protocols = load_protocol_reference(PROTOCOL_REFERENCE_PATH)
+        content = _request_recommendations(messages)
     except Exception as e:
-        logger.error(f"Error loading protocol reference: {str(e)}")
-        return {
-            "priority": "no data",
-            "protocol": "no data",
-            "iv_contrast": "no data",
-            "oral_contrast": "no data"
-        }
-
-    # Update contrast guidance to handle eGFR
-    egfr_value = patient_info['eGFR']
-    egfr_contraindicated = False
-    
-    if isinstance(egfr_value, str) and any(egfr_value.lower() == variant.lower() for variant in NO_DATA_VARIANTS):
-        contrast_guidance = "eGFR data not available - assuming normal renal function."
-        egfr_contraindicated = False
-    elif isinstance(egfr_value, (int, float)) and egfr_value < EGFR_CONTRAINDICATED:
-        contrast_guidance = "Due to eGFR < 30, IV contrast is typically contraindicated."
-        egfr_contraindicated = True
-    else:
-        contrast_guidance = "eGFR > 30, IV contrast can be administered with low risk."
-        egfr_contraindicated = False
+        # Not necessarily retried: only transient errors are, see _retry_transient_errors
+        logger.error("Error requesting recommendations for study %s: %s", patient_info['Study_ID'], e)
+        raise
 
-    # Make protocol guidance more structured
-    protocol_guidance = "CT Protocol Reference Document Specifications:\n"
-    relevant_protocols = reference_protocols.to_dict('records')
-    
-    for row in relevant_protocols:
-        protocol_guidance += (
-            f"Protocol: {row['Protocol']}\n"
-            f"- IV Contrast: {row['IV_Contrast']}\n"
-            f"- Oral Contrast: {row['Oral_Contrast']}\n"
-            f"- Example Indications: {row['Example_Indications']}\n"
-        )
+    # An out-of-schema answer is deterministic at temperature 0, so it is not retried
+    try:
+        recommendations = _parse_recommendations(content)
+    except (ValueError, TypeError) as e:
+        logger.error("Invalid recommendation for study %s: %s", patient_info['Study_ID'], e)
+        return _no_data_recommendations()
+
+    _cache_recommendations(cache_key, recommendations)
+    return recommendations
+
+async def _agenerate_protocol_recommendations(
+    aclient: AsyncOpenAI,
+    patient_info: dict,
+    cache_key: Optional[str],
+    static_prompt: str,
+    semaphore: asyncio.Semaphore
+) -> Dict:
+    """
+    Generate recommendations for one validated patient on the async client.
+    
+    Failures are logged and reported as a "no data" recommendation so that a
+    single bad row does not abort the rest of the batch.
+    """
+    cached = _get_cached_recommendations(cache_key)
+    if cached is not None:
+        return cached
+
+    messages = _build_messages(patient_info, static_prompt)
+
+    try:
+        async with semaphore:
+            content = await _arequest_recommendations(aclient, messages)
+    except Exception as e:
+        logger.error("Error requesting recommendations for study %s: %s", patient_info['Study_ID'], e)
+        return _no_data_recommendations()
+
+    try:
+        recommendations = _parse_recommendations(content)
+    except (ValueError, TypeError) as e:
+        logger.error("Invalid recommendation for study %s: %s", patient_info['Study_ID'], e)
+        return _no_data_recommendations()
+
+    _cache_recommendations(cache_key, recommendations)
+    return recommendations
 
-    # Generate recommendations with retry logic
-    for attempt in range(MAX_RETRIES):
+async def generate_protocol_recommendations_batch(
+    patients: List[dict], concurrency: int = MAX_CONCURRENT_REQUESTS
+) -> List[Dict]:
+    """
+    Generate CT protocol recommendations for many patients concurrently.
+    
+    Requests are issued on the async OpenAI client with at most
+    `concurrency` in flight at once. Patients that share a response cache
+    key are sent once and the result is copied to each of them. From a
+    notebook, call it with `await generate_protocol_recommendations_batch(patients)`;
+    from a script, each call may use its own `asyncio.run(...)`.
+    
+    Args:
+        patients (List[dict]): Patient information dictionaries, in the same
+            format accepted by generate_protocol_recommendations
+        concurrency (int): Maximum number of concurrent API requests
+        
+    Returns:
+        List[dict]: Recommendations in the same order as `patients`. Patients
+            whose recommendation could not be generated get "no data" values.
+        
+    Raises:
+        FileNotFoundError: If the protocol reference file does not exist
+        ValueError: If the protocol reference file is not a valid Excel file
+    """
+    static_prompt, static_digest = _get_static_prompt()
+
+    # Group patient positions by cache key so each unique scenario is requested once
+    results: List[Optional[Dict]] = [None] * len(patients)
+    groups: Dict[str, List[int]] = {}
+    uncached: List[int] = []
+    for index, patient_info in enumerate(patients):
         try:
-            response = client.chat.completions.create(
-                model=MODEL_NAME,
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": f"""
-Patient Information:
-Study ID: {patient_info['Study_ID']}
-Location: {patient_info['Location']}
-CT Exam Requested: {patient_info['CT_Exam']}
-Clinical Info: {patient_info['Clinical_Info']}
-Prior Contrast Reaction: {patient_info.get('Prior_Reaction', 'None')}
-eGFR: {patient_info['eGFR']} mL/min
-
-{PROTOCOL_SELECTION_GUIDANCE}
-
-{protocol_guidance}
-
-Provide your recommendation in this exact JSON format:
-{{
-    "priority": 1 or 2 or 3 or 4,
-    "protocol": "A/P or C/A/P or specific protocol",
-    "iv_contrast": "C+ or C- or C+ and C-",
-    "oral_contrast": "None or Water base or Water Only or Readi-Cat or Other"
-}}"""}
-                ],
-                temperature=MODEL_TEMPERATURE,
-                timeout=API_TIMEOUT
+            _validate_patient_info(patient_info)
+        except ValueError:
+            results[index] = _no_data_recommendations()
+            continue
+        cache_key = _response_cache_key(patient_info, static_digest)
+        if cache_key is None:
+            # Unparseable eGFR: never share a request or a cached answer
+            uncached.append(index)
+        else:
+            groups.setdefault(cache_key, []).append(index)
+    requests = list(groups.items()) + [(None, [index]) for index in uncached]
+
+    # A fresh client per call keeps its connections on the current event loop,
+    # so the function can be run repeatedly with asyncio.run()
+    semaphore = asyncio.Semaphore(concurrency)
+    async with _create_async_client() as aclient:
+        unique_recommendations = await asyncio.gather(*[
+            _agenerate_protocol_recommendations(
+                aclient, patients[indices[0]], cache_key, static_prompt, semaphore
             )
-            
-            recommendations = eval(response.choices[0].message.content)
-            
-            # Validate recommendations
-            if not all(key in recommendations for key in ['priority', 'protocol', 'iv_contrast', 'oral_contrast']):
-                raise ValueError("Invalid recommendation format")
-                
-            if recommendations['priority'] not in VALID_PRIORITIES:
-                raise ValueError(f"Invalid priority: {recommendations['priority']}")
-                
-            if recommendations['iv_contrast'] not in VALID_IV_CONTRAST:
-                raise ValueError(f"Invalid IV contrast: {recommendations['iv_contrast']}")
-                
-            if recommendations['oral_contrast'] not in VALID_ORAL_CONTRAST:
-                raise ValueError(f"Invalid oral contrast: {recommendations['oral_contrast']}")
-            
-            return recommendations
-            
-        except Exception as e:
-            logger.warning(f"Attempt {attempt + 1} failed: {str(e)}")
-            if attempt == MAX_RETRIES - 1:
-                logger.error(f"All attempts failed to generate recommendations: {str(e)}")
-                raise
+            for cache_key, indices in requests
+        ])
+
+    for (_, indices), recommendations in zip(requests, unique_recommendations):
+        for index in indices:
+            results[index] = dict(recommendations)
+    return results
+
+@_retry_transient_errors
+def _upload_batch_input(content: bytes):
+    """Upload a Batch API input file, allowing more time than a chat request."""
+    return client.with_options(timeout=BATCH_FILE_TIMEOUT).files.create(
+        file=("ct_protocol_batch.jsonl", content),
+        purpose="batch"
+    )
+
+@_retry_transient_errors
+def _retrieve_batch(batch_id: str):
+    """Fetch the current state of a Batch API job."""
+    return client.batches.retrieve(batch_id)
+
+@_retry_transient_errors
+def _download_batch_output(file_id: str) -> str:
+    """Download a Batch API output or error file, allowing more time than a chat request."""
+    return client.with_options(timeout=BATCH_FILE_TIMEOUT).files.content(file_id).text
+
+def submit_protocol_recommendations_batch(patients: List[dict]) -> str:
+    """
+    Submit recommendations for many patients as one OpenAI Batch API job.
+    
+    Intended for large offline runs: the job is processed server-side within
+    BATCH_COMPLETION_WINDOW at a lower cost than individual requests. Fetch
+    the results with collect_protocol_recommendations_batch.
+    
+    Args:
+        patients (List[dict]): Patient information dictionaries, in the same
+            format accepted by generate_protocol_recommendations
+        
+    Returns:
+        str: ID of the submitted batch
+        
+    Raises:
+        ValueError: If no patient has the required fields, or the protocol
+            reference file is not a valid Excel file
+        FileNotFoundError: If the protocol reference file does not exist
+    """
+    static_prompt, _ = _get_static_prompt()
+    
+    # One request per valid patient, identified by its position in `patients`
+    requests = []
+    for index, patient_info in enumerate(patients):
+        try:
+            _validate_patient_info(patient_info)
+        except ValueError:
             continue
+        requests.append(json.dumps({
+            "custom_id": str(index),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": MODEL_NAME,
+                "messages": _build_messages(patient_info, static_prompt),
+                "temperature": MODEL_TEMPERATURE,
+                "response_format": {"type": "json_object"}
+            }
+        }))
+    
+    if not requests:
+        raise ValueError("No valid patients to submit")
+    
+    batch_input = _upload_batch_input("\n".join(requests).encode())
+    # Not retried: a create that timed out may still have started a batch,
+    # and retrying it could submit (and bill) the same requests twice
+    batch = client.batches.create(
+        input_file_id=batch_input.id,
+        endpoint="/v1/chat/completions",
+        completion_window=BATCH_COMPLETION_WINDOW
+    )
+    logger.info("Submitted batch %s with %d requests", batch.id, len(requests))
+    return batch.id
+
+def collect_protocol_recommendations_batch(
+    batch_id: str, patients: List[dict], poll_interval: float = BATCH_POLL_INTERVAL
+) -> List[Dict]:
+    """
+    Wait for a Batch API job to finish and return its validated recommendations.
+    
+    Successful requests are read from the batch's output file and failed
+    ones from its error file, so every failure is logged per study.
+    
+    Args:
+        batch_id (str): ID returned by submit_protocol_recommendations_batch
+        patients (List[dict]): The same patients that were submitted
+        poll_interval (float): Seconds to wait between status checks
+        
+    Returns:
+        List[dict]: Recommendations in the same order as `patients`. Patients
+            whose request failed or returned an invalid answer get "no data" values.
+    """
+    batch = _retrieve_batch(batch_id)
+    while batch.status not in _BATCH_TERMINAL_STATUSES:
+        time.sleep(poll_interval)
+        batch = _retrieve_batch(batch_id)
+    
+    results = [_no_data_recommendations() for _ in patients]
+    if batch.status != "completed":
+        logger.error("Batch %s ended with status %s", batch_id, batch.status)
+        return results
+    if not batch.output_file_id and not batch.error_file_id:
+        logger.error("Batch %s produced no output", batch_id)
+        return results
+    if not batch.output_file_id:
+        logger.error("All requests in batch %s failed", batch_id)
+    
+    # The output file only holds successful requests; failures go to the error file
+    lines = []
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if file_id:
+            lines.extend(_download_batch_output(file_id).splitlines())
+    
+    for line in lines:
+        if not line:
+            continue
+        record = json.loads(line)
+        index = int(record['custom_id'])
+        response = record.get('response') or {}
+        if response.get('status_code') != 200:
+            logger.error(
+                "Batch request for study %s failed: %s",
+                patients[index]['Study_ID'], record.get('error') or response.get('body')
+            )
+            continue
+        try:
+            results[index] = _parse_recommendations(response['body']['choices'][0]['message']['content'])
+        except (ValueError, TypeError) as e:
+            logger.error("Invalid recommendation for study %s: %s", patients[index]['Study_ID'], e)
+    
+    return results
 
 def get_standard_protocols(protocol_file: str) -> Dict:
     """
     Load protocols from the protocol reference Excel file and convert to standard format
     
+    Shares the cached protocol reference with load_protocol_reference, and the
+    result is itself cached per file modification time. Callers must not
+    modify it in place.
+    
     Args:
         protocol_file (str): Path to the protocol reference Excel file
         
@@ -207,22 +826,13 @@ def get_standard_protocols(protocol_file: str) -> Dict:
         ValueError: If the file is not a valid Excel file
     """
     try:
-        df = pd.read_excel(protocol_file)
-        
-        protocols = {}
-        for _, row in df.iterrows():
-            protocols[row['Protocol']] = {
-                "iv_contrast": row['IV Contrast'],
-                "oral_contrast": row['Oral Contrast'],
-                "acquisitions": row['Acquisitions'],
-                "example_indications": row['Example Indications'],
-                "notes": row['Notes']
-            }
-        
-        return protocols
+        return _build_standard_protocols(protocol_file, os.path.getmtime(protocol_file))
     except FileNotFoundError:
-        logger.error(f"Protocol reference file not found: {protocol_file}")
+        logger.error("Protocol reference file not found: %s", protocol_file)
         raise
     except Exception as e:
-        logger.error(f"Error loading protocol reference file {protocol_file}: {str(e)}")
+        logger.error("Error loading protocol reference file %s: %s", protocol_file, e)
         raise ValueError(f"Invalid protocol reference file: {protocol_file}")
+
+# Fail fast on a missing or unreadable protocol reference, and warm its cache
+load_protocol_reference(PROTOCOL_REFERENCE_PATH)
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Raw protocol reference rows, as read from the Excel file before renaming
+PROTOCOL_REFERENCE = pd.DataFrame({
+    'Protocol': ['A/P', 'Renal colic'],
+    'IV Contrast': ['C+', 'C-'],
+    'Oral Contrast': ['None', 'None'],
+    'Acquisitions': ['Portal venous', 'Non-contrast'],
+    'Example Indications': ['Abdominal pain', 'Flank pain, hematuria'],
+    'Notes': ['', '']
+})
+
+
+@pytest.fixture(scope="session")
+def utils(tmp_path_factory):
+    """
+    Import utils against a stub protocol reference.
+
+    utils loads the protocol reference at import, from a path relative to the
+    working directory, so the session runs from a temporary directory holding
+    a placeholder workbook whose contents come from PROTOCOL_REFERENCE.
+    """
+    workdir = tmp_path_factory.mktemp("ct_protocol")
+    (workdir / "data").mkdir()
+    (workdir / "data" / "Institutional-Protocols.xlsx").touch()
+
+    monkeypatch = pytest.MonkeyPatch()
+    monkeypatch.chdir(workdir)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(pd, "read_excel", lambda *args, **kwargs: PROTOCOL_REFERENCE.copy())
+
+    import utils as utils_module
+    yield utils_module
+
+    monkeypatch.undo()
@@ -0,0 +1,191 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import httpx
+import openai
+import pandas as pd
+import pytest
+from tenacity import wait_none
+
+PATIENT = {
+    'Study_ID': 1,
+    'Location': 'ER',
+    'CT_Exam': 'CT A/P',
+    'Clinical_Info': 'RLQ pain, rule out appendicitis',
+    'Prior_Reaction': 'None',
+    'eGFR': 85.0
+}
+
+RECOMMENDATION = {
+    'priority': 1,
+    'protocol': 'A/P',
+    'iv_contrast': 'C+',
+    'oral_contrast': 'None'
+}
+
+
+def test_batch_requests_identical_patients_once(utils, monkeypatch):
+    utils._response_cache.clear()
+    request = AsyncMock(return_value=json.dumps(RECOMMENDATION))
+    monkeypatch.setattr(utils, "_arequest_recommendations", request)
+
+    patients = [dict(PATIENT, Study_ID=study_id) for study_id in range(5)]
+    results = asyncio.run(utils.generate_protocol_recommendations_batch(patients))
+
+    assert request.await_count == 1
+    assert results == [RECOMMENDATION] * len(patients)
+
+
+def _completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def fake_client(utils, monkeypatch):
+    """Replace the OpenAI client and skip the backoff between retries."""
+    utils._response_cache.clear()
+    fake = MagicMock()
+    monkeypatch.setattr(utils, "client", fake)
+    monkeypatch.setattr(utils._request_recommendations.retry, "wait", wait_none())
+    return fake
+
+
+def test_transient_api_error_is_retried(utils, fake_client):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    fake_client.chat.completions.create.side_effect = [
+        openai.APIConnectionError(request=request),
+        _completion(json.dumps(RECOMMENDATION)),
+    ]
+
+    result = utils.generate_protocol_recommendations(PATIENT, PATIENT['eGFR'])
+
+    assert fake_client.chat.completions.create.call_count == 2
+    assert result == RECOMMENDATION
+
+
+def test_non_transient_api_error_is_not_retried(utils, fake_client, caplog):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    fake_client.chat.completions.create.side_effect = openai.AuthenticationError(
+        "Invalid API key", response=httpx.Response(401, request=request), body=None
+    )
+
+    with pytest.raises(openai.AuthenticationError):
+        utils.generate_protocol_recommendations(PATIENT, PATIENT['eGFR'])
+
+    assert fake_client.chat.completions.create.call_count == 1
+    assert "Error requesting recommendations for study 1" in caplog.text
+
+
+def test_invalid_recommendation_is_not_retried(utils, fake_client):
+    fake_client.chat.completions.create.return_value = _completion(
+        json.dumps(dict(RECOMMENDATION, iv_contrast='maybe'))
+    )
+
+    result = utils.generate_protocol_recommendations(PATIENT, PATIENT['eGFR'])
+
+    assert fake_client.chat.completions.create.call_count == 1
+    assert result == utils._no_data_recommendations()
+
+
+@pytest.mark.parametrize("low_egfr", [20, np.int64(20), "20", np.float32(12), " 20 "])
+def test_cached_normal_egfr_answer_not_reused_for_low_egfr(utils, monkeypatch, low_egfr):
+    utils._response_cache.clear()
+    low_egfr_recommendation = dict(RECOMMENDATION, iv_contrast='C-')
+    request = MagicMock(side_effect=[json.dumps(RECOMMENDATION), json.dumps(low_egfr_recommendation)])
+    monkeypatch.setattr(utils, "_request_recommendations", request)
+
+    utils.generate_protocol_recommendations(PATIENT, PATIENT['eGFR'])
+    low_patient = dict(PATIENT, Study_ID=2, eGFR=low_egfr)
+    result = utils.generate_protocol_recommendations(low_patient, low_egfr)
+
+    assert request.call_count == 2
+    assert result['iv_contrast'] == 'C-'
+
+
+def test_unparseable_egfr_is_not_cached(utils, monkeypatch):
+    utils._response_cache.clear()
+    request = MagicMock(return_value=json.dumps(RECOMMENDATION))
+    monkeypatch.setattr(utils, "_request_recommendations", request)
+
+    patient = dict(PATIENT, eGFR='pending')
+    utils.generate_protocol_recommendations(patient, patient['eGFR'])
+    utils.generate_protocol_recommendations(patient, patient['eGFR'])
+
+    assert request.call_count == 2
+
+
+def test_iter_patients_yields_valid_patient_info(utils, tmp_path):
+    csv_file = tmp_path / "patients.csv"
+    pd.DataFrame({
+        'Study ID #': ['00123', '2', '3', '4'],
+        'Location [IP, ER, OP]': ['ER', 'OP', 'IP', 'ER'],
+        'Age': [54, 61, 38, 70],
+        'Sex': ['F', 'M', 'F', 'M'],
+        'CT Exam Requested': ['CT A/P'] * 4,
+        'Clinical Information/Reason for Scan': ['RLQ pain'] * 4,
+        'Previous adverse reaction to contrast (if YES, what type)': ['No'] * 4,
+        'eGFR (mL/min)': ['>90', 'no data', '45', 'pending'],
+        'Creatinine (umol/L)': [70, 88, 130, 95]
+    }).to_csv(csv_file, index=False)
+
+    patients = list(utils.iter_patients(str(csv_file), chunksize=2))
+
+    for patient_info in patients:
+        utils._validate_patient_info(patient_info)
+    # The unparseable eGFR row is skipped rather than defaulted
+    assert [patient['Study_ID'] for patient in patients] == ['00123', '2', '3']
+    assert [patient['eGFR'] for patient in patients] == [90, "no data", 45.0]
+
+
+def _batch_record(custom_id, status_code, body, error=None):
+    return json.dumps({
+        'custom_id': custom_id,
+        'response': {'status_code': status_code, 'body': body},
+        'error': error
+    })
+
+
+def _completion_body(content):
+    return {'choices': [{'message': {'content': content}}]}
+
+
+def test_collect_batch_maps_output_and_error_files(utils, monkeypatch, caplog):
+    files = {
+        'output-file': "\n".join([
+            _batch_record('2', 200, _completion_body(json.dumps(RECOMMENDATION))),
+            _batch_record('0', 200, _completion_body('not json')),
+        ]),
+        'error-file': _batch_record('1', 500, {'error': {'message': 'server error'}}),
+    }
+    batch = SimpleNamespace(status='completed', output_file_id='output-file', error_file_id='error-file')
+    monkeypatch.setattr(utils, "_retrieve_batch", lambda batch_id: batch)
+    monkeypatch.setattr(utils, "_download_batch_output", files.__getitem__)
+
+    patients = [dict(PATIENT, Study_ID=f"S{index}") for index in range(4)]
+    results = utils.collect_protocol_recommendations_batch('batch-1', patients, poll_interval=0)
+
+    no_data = utils._no_data_recommendations()
+    assert results == [no_data, no_data, RECOMMENDATION, no_data]
+    assert "Invalid recommendation for study S0" in caplog.text
+    assert "Batch request for study S1 failed" in caplog.text
+
+
+def test_collect_batch_without_output_file_logs_every_failure(utils, monkeypatch, caplog):
+    files = {
+        'error-file': "\n".join(
+            _batch_record(str(index), 400, {'error': {'message': 'bad request'}}) for index in range(2)
+        ),
+    }
+    batch = SimpleNamespace(status='completed', output_file_id=None, error_file_id='error-file')
+    monkeypatch.setattr(utils, "_retrieve_batch", lambda batch_id: batch)
+    monkeypatch.setattr(utils, "_download_batch_output", files.__getitem__)
+
+    patients = [dict(PATIENT, Study_ID=f"S{index}") for index in range(2)]
+    results = utils.collect_protocol_recommendations_batch('batch-1', patients, poll_interval=0)
+
+    assert results == [utils._no_data_recommendations()] * 2
+    assert "All requests in batch batch-1 failed" in caplog.text
+    assert "study S0 failed" in caplog.text and "study S1 failed" in caplog.text